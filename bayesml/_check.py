@@ -38,23 +38,25 @@ def nonneg_int(val,val_name,exception_class):
     raise(exception_class(val_name + " must be int. Its value must be non-negative (including 0)."))
 
 def nonneg_ints(val,val_name,exception_class):
-    try:
-        return nonneg_int(val,val_name,exception_class)
-    except:
-        pass
     if type(val) is np.ndarray:
         if np.issubdtype(val.dtype,np.integer) and np.all(val>=0):
             return val
+    else:
+        try:
+            return nonneg_int(val,val_name,exception_class)
+        except:
+            pass
     raise(exception_class(val_name + " must be int or a numpy.ndarray whose dtype is int. Its values must be non-negative (including 0)."))
 
 def pos_ints(val,val_name,exception_class):
-    try:
-        return pos_int(val,val_name,exception_class)
-    except:
-        pass
     if type(val) is np.ndarray:
         if np.issubdtype(val.dtype,np.integer) and np.all(val>0):
             return val
+    else:
+        try:
+            return pos_int(val,val_name,exception_class)
+        except:
+            pass
     raise(exception_class(val_name + " must be int or a numpy.ndarray whose dtype is int. Its values must be positive (not including 0)."))
 
 def int_vec(val,val_name,exception_class):
@@ -95,13 +97,14 @@ def int_of_01(val,val_name,exception_class):
     raise(exception_class(val_name + " must be int. Its value must be 0 or 1."))
 
 def ints_of_01(val,val_name,exception_class):
-    try:
-        return int_of_01(val,val_name,exception_class)
-    except:
-        pass
     if type(val) is np.ndarray:
         if np.issubdtype(val.dtype,np.integer) and np.all(val >= 0) and np.all(val <= 1):
             return val
+    else:
+        try:
+            return int_of_01(val,val_name,exception_class)
+        except:
+            pass
     raise(exception_class(val_name + " must be int or a numpy.ndarray whose dtype is int. Its values must be 0 or 1."))
 
 def int_vec_of_01(val,val_name,exception_class):
@@ -161,27 +164,29 @@ def float_(val,val_name,exception_class):
     raise(exception_class(val_name + " must be a scalar."))
 
 def floats(val,val_name,exception_class):
-    try:
-        return float_(val,val_name,exception_class)
-    except:
-        pass
     if type(val) is np.ndarray:
         if np.issubdtype(val.dtype,np.integer):
             return val.astype(float)
         if np.issubdtype(val.dtype,np.floating):
             return val
+    else:
+        try:
+            return float_(val,val_name,exception_class)
+        except:
+            pass
     raise(exception_class(val_name + " must be float or a numpy.ndarray."))
 
 def pos_floats(val,val_name,exception_class):
-    try:
-        return pos_float(val,val_name,exception_class)
-    except:
-        pass
     if type(val) is np.ndarray:
         if np.issubdtype(val.dtype,np.integer) and np.all(val>0):
             return val.astype(float)
         if np.issubdtype(val.dtype,np.floating) and np.all(val>0.0):
             return val
+    else:
+        try:
+            return pos_float(val,val_name,exception_class)
+        except:
+            pass
     raise(exception_class(val_name + " must be float or a numpy.ndarray. Its values must be positive (not including 0)"))
 
 def float_vec(val,val_name,exception_class):
@@ -238,13 +243,14 @@ def int_(val,val_name,exception_class):
     raise(exception_class(val_name + " must be an integer."))
 
 def ints(val,val_name,exception_class):
-    try:
-        return int_(val,val_name,exception_class)
-    except:
-        pass
     if type(val) is np.ndarray:
         if np.issubdtype(val.dtype,np.integer):
             return val
+    else:
+        try:
+            return int_(val,val_name,exception_class)
+        except:
+            pass
     raise(exception_class(val_name + " must be int or a numpy.ndarray whose dtype is int."))
 
 def onehot_vec(val,val_name,exception_class):
@@ -270,3 +276,13 @@ def shape_consistency(val: int, val_name: str, correct: int, correct_name: str,
         message = (f"{val_name} must coincide with {correct_name}: "
                    + f"{val_name} = {val}, {correct_name} = {correct}")
         raise(exception_class(message))
+
+def shape_broadcastable(val: tuple, val_name: str, correct: tuple, correct_name: str, exception_class):
+    try:
+        if np.broadcast_shapes(val, correct) == correct:
+            return
+    except ValueError:
+        pass
+    message = (f"{val_name} must be broadcastable to {correct_name}: "
+               + f"{val_name} = {val}, {correct_name} = {correct}")
+    raise(exception_class(message))
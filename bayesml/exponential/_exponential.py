@@ -1,497 +1,734 @@
-# Code Author
-# Luyu Ruan <zzstarsound@gmail.com>
-# Koshi Shimada <shimada.koshi.re@gmail.com>
-# Yuji Iikubo <yuji-iikubo.8@fuji.waseda.jp>
-# Yuta Nakahara <yuta.nakahara@aoni.waseda.jp>
-# Document Author
-# Yuji Iikubo <yuji-iikubo.8@fuji.waseda.jp>
-# Yuta Nakahara <yuta.nakahara@aoni.waseda.jp>
-import warnings
-import numpy as np
-from scipy.stats import expon as ss_expon, gamma as ss_gamma, lomax as ss_lomax
-from scipy.special import gammaln
-import matplotlib.pyplot as plt
-
-from .. import base
-from .._exceptions import ParameterFormatError, DataFormatError, CriteriaError, ResultWarning
-from .. import _check
-
-class GenModel(base.Generative):
-    """The stochastic data generative model and the prior distribution.
-
-    Parameters
-    ----------
-    lambda_ : float, optional
-        a positive real number, by default 1.0.
-    h_alpha : float, optional
-        a positive real number, by default 1.0. 
-    h_beta : float, optional
-        a positive real number, by default 1.0. 
-    seed : {None, int}, optional
-        A seed to initialize numpy.random.default_rng(),
-        by default None
-    """
-    def __init__(self,lambda_=1.0,h_alpha=1.0,h_beta=1.0,seed=None):
-        self.rng = np.random.default_rng(seed)
-
-        # params
-        self.lambda_ = 1.0
-
-        # h_params
-        self.h_alpha = 1.0
-        self.h_beta = 1.0
-
-        self.set_params(lambda_)
-        self.set_h_params(h_alpha,h_beta)
-
-    def get_constants(self):
-        """Get constants of GenModel.
-
-        This model does not have any constants. 
-        Therefore, this function returns an emtpy dict ``{}``.
-        
-        Returns
-        -------
-        constants : an empty dict
-        """
-        return {}
-
-    def set_h_params(self,h_alpha=None,h_beta=None):
-        """Set the hyperparameters of the prior distribution.
-        
-        Parameters
-        ----------
-        h_alpha : float, optional
-            a positive real number, by default None.
-        h_beta : float, optional
-            a positive real number, by default None.
-        """
-        if h_alpha is not None:
-            self.h_alpha = _check.pos_float(h_alpha,'h_alpha',ParameterFormatError)
-        if h_beta is not None:
-            self.h_beta = _check.pos_float(h_beta,'h_beta',ParameterFormatError)
-        return self
-
-    def get_h_params(self):
-        """Get the hyperparameters of the prior distribution.
-
-        Returns
-        -------
-        h_params : dict of {str: float}
-            * ``"h_alpha"`` : The value of ``self.h_alpha``
-            * ``"h_beta"`` : The value of ``self.h_beta``
-        """
-        return {"h_alpha":self.h_alpha, "h_beta":self.h_beta}
-    
-    def gen_params(self):
-        """Generate the parameter from the prior distribution.
-        
-        The generated vaule is set at ``self.lambda_``.
-        """
-        self.lambda_ = self.rng.gamma(self.h_alpha,1.0/self.h_beta)
-        return self
-
-    def set_params(self,lambda_=None):
-        """Set the parameter of the sthocastic data generative model.
-
-        Parameters
-        ----------
-        lambda_ : float, optional
-            a positive real number, by default None.
-        """
-        if lambda_ is not None:
-            self.lambda_ = _check.pos_float(lambda_, 'lambda_', ParameterFormatError)
-        return self
-
-    def get_params(self):
-        """Get the parameter of the sthocastic data generative model.
-
-        Returns
-        -------
-        params : dict of {str:float}
-            * ``"lambda_"`` : The value of ``self.lambda_``.
-        """
-        return {"lambda_":self.lambda_}
-
-    def gen_sample(self,sample_size):
-        """Generate a sample from the stochastic data generative model.
-
-        Parameters
-        ----------
-        sample_size : int
-            A positive integer
-
-        Returns
-        -------
-        x : numpy ndarray
-            1 dimensional array whose size is ``sammple_size`` and elements are positive real numbers.
-        """
-        _check.pos_int(sample_size, 'sample_size', DataFormatError)
-        return self.rng.exponential(1.0/self.lambda_, sample_size)
-        
-    def save_sample(self,filename,sample_size):
-        """Save the generated sample as NumPy ``.npz`` format.
-
-        It is saved as aNpzFile with keyword: \"x\".
-
-        Parameters
-        ----------
-        filename : str
-            The filename to which the sample is saved.
-            ``.npz`` will be appended if it isn't there.
-        sample_size : int
-            A positive integer
-        
-        See Also
-        --------
-        numpy.savez_compressed
-        """
-        np.savez_compressed(filename,x=self.gen_sample(sample_size))
-
-    def visualize_model(self,sample_size=100,hist_bins=10):
-        """Visualize the stochastic data generative model and generated samples.
-
-        Parameters
-        ----------
-        sample_size : int, optional
-            A positive integer, by default 100.
-        hist_bins : float, optional
-            A positive float, by default 10.
-
-        Examples
-        --------
-        >>> from bayesml import normal
-        >>> model = normal.GenModel()
-        >>> model.visualize_model()
-        lambda_:1.0
-
-        .. image:: ./images/exponential_example.png
-        """
-        _check.pos_int(sample_size, 'sample_size', DataFormatError)
-        _check.pos_int(hist_bins, 'hist_bins', DataFormatError)
-        sample = self.gen_sample(sample_size)
-
-        print(f"lambda_:{self.lambda_}")
-
-        fig, ax = plt.subplots()
-        ax.hist(sample,density=True,label=f"normalized hist n={sample_size}",bins=hist_bins)
-
-        x = np.linspace(1.0e-8,
-                        sample.max()+(sample.max()-sample.min())*0.25,
-                        100)
-        y = ss_expon.pdf(x,scale=1.0/self.lambda_)
-        plt.plot(x, y, label=f"Exponential PDF lambda_={self.lambda_}")
-
-        ax.set_xlabel("Realization")
-        ax.set_ylabel("Probability or frequency")
-        plt.title(f"PDF and normalized histogram")
-        plt.legend()
-        plt.show()
-
-
-class LearnModel(base.Posterior,base.PredictiveMixin):
-    """The posterior distribution and the predictive distribution.
-
-    Parameters
-    ----------
-    h0_alpha : float, optional
-        a positive real number, by default 1.0.
-    h0_beta : float, optional
-        a positive real number, by default 1.0.
-
-    Attributes
-    ----------
-    hn_alpha : float
-        a positive real number
-    hn_beta : float
-        a positive real number
-    p_kappa : float
-        a positive real number
-    p_lambda : float
-        a positive real number
-    """
-    def __init__(self,h0_alpha=1.0, h0_beta=1.0):
-        # h0_params
-        self.h0_alpha = 1.0
-        self.h0_beta = 1.0
-
-        # hn_params
-        self.hn_alpha = 1.0
-        self.hn_beta = 1.0
-
-        # p_params
-        self.p_kappa = 1.0
-        self.p_lambda = 1.0
-
-        self.set_h0_params(h0_alpha,h0_beta)
-    
-    def get_constants(self):
-        """Get constants of LearnModel.
-
-        This model does not have any constants. 
-        Therefore, this function returns an emtpy dict ``{}``.
-        
-        Returns
-        -------
-        constants : an empty dict
-        """
-        return {}
-
-    def set_h0_params(self,h0_alpha=None,h0_beta=None):
-        """Set initial values of the hyperparameter of the posterior distribution.
-
-        Parameters
-        ----------
-        h0_alpha : float, optional
-            a positive real number, by default None.
-        h0_beta : float, optional
-            a positive real number, by default None.
-        """
-        if h0_alpha is not None:
-            self.h0_alpha = _check.pos_float(h0_alpha, 'h0_alpha', ParameterFormatError)
-        if h0_beta is not None:
-            self.h0_beta = _check.pos_float(h0_beta, 'h0_beta', ParameterFormatError)
-        self.reset_hn_params()
-        return self
-
-    def get_h0_params(self):
-        """Get the initial values of the hyperparameters of the posterior distribution.
-
-        Returns
-        -------
-        h0_params : dict of {str: float}
-            * ``"h0_alpha"`` : The value of ``self.h0_alpha``
-            * ``"h0_beta"`` : The value of ``self.h0_beta``
-        """
-        return {"h0_alpha":self.h0_alpha, "h0_beta": self.h0_beta}
-
-    def set_hn_params(self,hn_alpha=None,hn_beta=None):
-        """Set updated values of the hyperparameter of the posterior distribution.
-
-        Parameters
-        ----------
-        hn_alpha : float, optional
-            a positive real number, by default None.
-        hn_beta : float, optional
-            a positive real number, by default None.
-        """
-        if hn_alpha is not None:
-            self.hn_alpha = _check.pos_float(hn_alpha, 'hn_alpha', ParameterFormatError)
-        if hn_beta is not None:
-            self.hn_beta = _check.pos_float(hn_beta, 'hn_beta', ParameterFormatError)
-        self.calc_pred_dist()
-        return self
-
-    def get_hn_params(self):
-        """Get the hyperparameters of the posterior distribution.
-
-        Returns
-        -------
-        hn_params : dict of {str: float}
-            * ``"hn_alpha"`` : The value of ``self.hn_alpha``
-            * ``"hn_beta"`` : The value of ``self.hn_beta``
-        """
-        return {"hn_alpha":self.hn_alpha, "hn_beta":self.hn_beta}
-
-    def _check_sample(self,x):
-        return _check.pos_floats(x, 'x', DataFormatError)
-
-    def update_posterior(self,x):
-        """Update the hyperparameters of the posterior distribution using traning data.
-
-        Parameters
-        ----------
-        x : numpy.ndarray
-            All the elements must be positive real numbers.
-        """
-        x = self._check_sample(x)
-        try:
-            self.hn_alpha += x.size
-        except:
-            self.hn_alpha += 1
-        self.hn_beta += np.sum(x)
-        return self
-
-    def _update_posterior(self,x):
-        """Update opsterior without input check."""
-        self.hn_alpha += x.size
-        self.hn_beta += x.sum()
-        return self
-
-    def estimate_params(self,loss="squared",dict_out=False):
-        """Estimate the parameter of the stochastic data generative model under the given criterion.
-
-        Parameters
-        ----------
-        loss : str, optional
-            Loss function underlying the Bayes risk function, by default \"squared\".
-            This function supports \"squared\", \"0-1\", \"abs\", and \"KL\".
-        dict_out : bool, optional
-            If ``True``, output will be a dict, by default ``False``.
-
-        Returns
-        -------
-        estimator : {float, None, rv_frozen}
-            The estimated values under the given loss function. If it is not exist, `None` will be returned.
-            If the loss function is \"KL\", the posterior distribution itself will be returned
-            as rv_frozen object of scipy.stats.
-
-        See Also
-        --------
-        scipy.stats.rv_continuous
-        scipy.stats.rv_discrete
-        """
-        if loss == "squared":
-            if dict_out:
-                return {'lambda_':self.hn_alpha / self.hn_beta}
-            else:
-                return self.hn_alpha / self.hn_beta
-        elif loss == "0-1":
-            if self.hn_alpha > 1.0 :
-                if dict_out:
-                    return {'lambda_':(self.hn_alpha - 1.0) / self.hn_beta}
-                else:
-                    return (self.hn_alpha - 1.0) / self.hn_beta
-            else:
-                if dict_out:
-                    return {'lambda_':0.0}
-                else:
-                    return 0.0
-        elif loss == "abs":
-            if dict_out:
-                return {'lambda_':ss_gamma.median(a=self.hn_alpha,scale=1/self.hn_beta)}
-            else:
-                return ss_gamma.median(a=self.hn_alpha,scale=1/self.hn_beta)
-        elif loss == "KL":
-            return ss_gamma(a=self.hn_alpha,scale=1/self.hn_beta)
-        else:
-            raise(CriteriaError("Unsupported loss function! "
-                                "This function supports \"squared\", \"0-1\", \"abs\", and \"KL\"."))
-    
-    def estimate_interval(self,credibility=0.95):
-        """Credible interval of the parameter.
-
-        Parameters
-        ----------
-        credibility : float, optional
-            A posterior probability that the interval conitans the paramter, by default 0.95.
-
-        Returns
-        -------
-        lower, upper: float
-            The lower and the upper bound of the interval
-        """
-        _check.float_in_closed01(credibility, 'credibility', CriteriaError)
-        return ss_gamma.interval(credibility,a=self.hn_alpha,scale=1/self.hn_beta)
-    
-    def visualize_posterior(self):
-        """Visualize the posterior distribution for the parameter.
-
-        Examples
-        --------
-        >>> from bayesml import exponential
-        >>> gen_model = exponential.GenModel(lambda_=2.0)
-        >>> x = gen_model.gen_sample(20)
-        >>> learn_model = exponential.LearnModel()
-        >>> learn_model.update_posterior(x)
-        >>> learn_model.visualize_posterior()
-
-        .. image:: ./images/exponential_posterior.png
-        """
-        x = np.linspace(max(1.0e-8,self.hn_alpha/self.hn_beta-4.0*np.sqrt(self.hn_alpha)/self.hn_beta),
-                        self.hn_alpha/self.hn_beta+4.0*np.sqrt(self.hn_alpha)/self.hn_beta,
-                        100)
-        fig, ax = plt.subplots()
-        ax.plot(x,self.estimate_params(loss="KL").pdf(x))
-        ax.set_xlabel("lambda")
-        ax.set_ylabel("posterior")
-        plt.show()
-    
-    def get_p_params(self):
-        """Get the parameters of the predictive distribution.
-
-        Returns
-        -------
-        p_params : dict of {str: float}
-            * ``"p_kappa"`` : The value of ``self.p_kappa``
-            * ``"p_lambda"`` : The value of ``self.p_lambda``
-        """
-        return {"p_kappa":self.p_kappa, "p_lambda":self.p_lambda}
-
-    def calc_pred_dist(self):
-        """Calculate the parameters of the predictive distribution."""
-        self.p_kappa = self.hn_alpha
-        self.p_lambda = self.hn_beta
-        return self
-
-    def _calc_pred_density(self,x):
-        return ss_lomax.pdf(x,c=self.p_kappa,scale=self.p_lambda)
-
-    def make_prediction(self,loss="squared"):
-        """Predict a new data point under the given criterion.
-
-        Parameters
-        ----------
-        loss : str, optional
-            Loss function underlying the Bayes risk function, by default \"squared\".
-            This function supports \"squared\", \"0-1\", \"abs\", and \"KL\".
-
-        Returns
-        -------
-        Predicted_value : {int, numpy.ndarray}
-            The predicted value under the given loss function.
-            If the loss function is \"KL\", the predictive distribution itself will be returned
-            as numpy.ndarray.
-        """
-        if loss == "squared": # Mean of EP
-            if self.p_kappa > 1:
-                return self.p_lambda / (self.p_kappa-1)
-            else:
-                warnings.warn("Mean doesn't exist for the current p_kappa.",ResultWarning)
-                return None
-        elif loss == "0-1": # Mode of EP
-            return 0
-        elif loss == "abs": # Median of EP
-            return self.p_lambda * (2.0**(1.0/self.p_kappa) - 1)
-        elif loss == "KL": # EP
-            return ss_lomax(c=self.p_kappa,scale=self.p_lambda)
-        else:
-            raise(CriteriaError("Unsupported loss function! "
-                                "This function supports \"squared\", \"0-1\", \"abs\", and \"KL\"."))
-
-    def pred_and_update(self,x,loss="squared"):
-        """Predict a new data point and update the posterior sequentially.
-
-        Parameters
-        ----------
-        x : float
-            a positive real number
-        loss : str, optional
-            Loss function underlying the Bayes risk function, by default \"squared\".
-            This function supports \"squared\", \"0-1\", \"abs\", and \"KL\".
-
-        Returns
-        -------
-        Predicted_value : {float, numpy.ndarray}
-            The predicted value under the given loss function.
-            If the loss function is \"KL\", the predictive distribution itself will be returned
-            as numpy.ndarray.
-        """
-        _check.pos_float(x,'x',DataFormatError)
-        self.calc_pred_dist()
-        prediction = self.make_prediction(loss=loss)
-        self.update_posterior(x)
-        return prediction
-
-    def calc_log_marginal_likelihood(self):
-        """Calculate log marginal likelihood
-
-        Returns
-        -------
-        log_marginal_likelihood : float
-            The log marginal likelihood.
-        """
-        return (self.h0_alpha * np.log(self.h0_beta)
-                - gammaln(self.h0_alpha)
-                - self.hn_alpha * np.log(self.hn_beta)
-                + gammaln(self.hn_alpha))
\ No newline at end of file
+# Code Author
+# Luyu Ruan <zzstarsound@gmail.com>
+# Koshi Shimada <shimada.koshi.re@gmail.com>
+# Yuji Iikubo <yuji-iikubo.8@fuji.waseda.jp>
+# Yuta Nakahara <yuta.nakahara@aoni.waseda.jp>
+# Document Author
+# Yuji Iikubo <yuji-iikubo.8@fuji.waseda.jp>
+# Yuta Nakahara <yuta.nakahara@aoni.waseda.jp>
+import warnings
+import math
+from functools import lru_cache
+import numpy as np
+from scipy.stats import expon as ss_expon, gamma as ss_gamma, lomax as ss_lomax
+from scipy.special import gammaln, gammaincinv
+import matplotlib.pyplot as plt
+
+from .. import base
+from .._exceptions import ParameterFormatError, DataFormatError, CriteriaError, ResultWarning
+from .. import _check
+
+try:
+    from numba import njit, guvectorize
+
+    @njit(cache=True)
+    def _validate_and_sum(x):
+        """Scan ``x`` once, rejecting non-positive or non-finite elements
+        and accumulating the sum.
+
+        Returns ``(-1.0,i)`` with the index ``i`` of the first invalid element,
+        or ``(sum,x.size)`` if all the elements are positive and finite.
+        ``fastmath`` must stay off here: it would license the compiler to
+        assume no NaNs and skip the guard.
+        """
+        s = 0.0
+        for i in range(x.size):
+            v = x[i]
+            if not (v > 0.0 and np.isfinite(v)):
+                return -1.0, i
+            s += v
+        return s, x.size
+
+    @guvectorize(['float64[:],float64,float64,float64[:]'],'(n),(),()->(n)',cache=True)
+    def _pred_and_update_squared(x,alpha,beta,out):
+        """Squared-loss predictions of a streaming posterior update starting from (alpha,beta)."""
+        for i in range(x.shape[0]):
+            if alpha > 1.0:
+                out[i] = beta / (alpha-1.0)
+            else:
+                out[i] = np.nan
+            alpha += 1.0
+            beta += x[i]
+except ImportError:
+    _validate_and_sum = None
+    _pred_and_update_squared = None
+
+@lru_cache(maxsize=128)
+def _gamma_median_exact(alpha,beta):
+    """Median of the gamma distribution with shape ``alpha`` and rate ``beta``.
+
+    The quantile is evaluated through scipy.special.gammaincinv directly,
+    bypassing the rv_frozen machinery of scipy.stats.gamma. The result is
+    memoized because the hyperparameters are unchanged between posterior updates.
+    """
+    return gammaincinv(alpha,0.5) / beta
+
+def _gamma_median(alpha,beta):
+    """Median of the gamma distribution with shape ``alpha`` and rate ``beta``.
+
+    For ``alpha >= 5`` the Wilson-Hilferty approximation
+    ``alpha*(1 - 1/(9*alpha))**3 / beta`` is used instead of the iterative
+    inversion of the incomplete gamma function; its relative error is
+    about 1e-4 at ``alpha=10`` and shrinks as ``alpha`` grows.
+    """
+    if alpha < 5.0:
+        return _gamma_median_exact(alpha,beta)
+    return alpha * (1.0 - 1.0/(9.0*alpha))**3 / beta
+
+class GenModel(base.Generative):
+    """The stochastic data generative model and the prior distribution.
+
+    Parameters
+    ----------
+    lambda_ : float, optional
+        a positive real number, by default 1.0.
+    h_alpha : float, optional
+        a positive real number, by default 1.0. 
+    h_beta : float, optional
+        a positive real number, by default 1.0. 
+    seed : {None, int}, optional
+        A seed to initialize numpy.random.default_rng(),
+        by default None
+    """
+    def __init__(self,lambda_=1.0,h_alpha=1.0,h_beta=1.0,seed=None):
+        self.rng = np.random.default_rng(seed)
+
+        # params
+        self.lambda_ = 1.0
+
+        # h_params
+        self.h_alpha = 1.0
+        self.h_beta = 1.0
+
+        self.set_params(lambda_)
+        self.set_h_params(h_alpha,h_beta)
+
+    def get_constants(self):
+        """Get constants of GenModel.
+
+        This model does not have any constants. 
+        Therefore, this function returns an emtpy dict ``{}``.
+        
+        Returns
+        -------
+        constants : an empty dict
+        """
+        return {}
+
+    def set_h_params(self,h_alpha=None,h_beta=None):
+        """Set the hyperparameters of the prior distribution.
+        
+        Parameters
+        ----------
+        h_alpha : float, optional
+            a positive real number, by default None.
+        h_beta : float, optional
+            a positive real number, by default None.
+        """
+        if h_alpha is not None:
+            self.h_alpha = _check.pos_float(h_alpha,'h_alpha',ParameterFormatError)
+        if h_beta is not None:
+            self.h_beta = _check.pos_float(h_beta,'h_beta',ParameterFormatError)
+        self._inv_h_beta = 1.0 / self.h_beta
+        return self
+
+    def get_h_params(self):
+        """Get the hyperparameters of the prior distribution.
+
+        Returns
+        -------
+        h_params : dict of {str: float}
+            * ``"h_alpha"`` : The value of ``self.h_alpha``
+            * ``"h_beta"`` : The value of ``self.h_beta``
+        """
+        return {"h_alpha":self.h_alpha, "h_beta":self.h_beta}
+    
+    def gen_params(self):
+        """Generate the parameter from the prior distribution.
+
+        The generated vaule is set at ``self.lambda_``.
+        """
+        self.lambda_ = self.rng.gamma(self.h_alpha,self._inv_h_beta)
+        return self
+
+    def gen_params_batch(self,n):
+        """Generate parameters from the prior distribution in a batch.
+
+        Unlike ``gen_params``, the generated values are returned
+        and ``self.lambda_`` is not updated.
+
+        Parameters
+        ----------
+        n : int
+            A positive integer
+
+        Returns
+        -------
+        lambdas : numpy ndarray
+            1 dimensional array whose size is ``n`` and elements are positive real numbers.
+        """
+        _check.pos_int(n,'n',DataFormatError)
+        return self.rng.gamma(self.h_alpha,self._inv_h_beta,size=n)
+
+    def set_params(self,lambda_=None):
+        """Set the parameter of the sthocastic data generative model.
+
+        Parameters
+        ----------
+        lambda_ : float, optional
+            a positive real number, by default None.
+        """
+        if lambda_ is not None:
+            self.lambda_ = _check.pos_float(lambda_, 'lambda_', ParameterFormatError)
+        return self
+
+    def get_params(self):
+        """Get the parameter of the sthocastic data generative model.
+
+        Returns
+        -------
+        params : dict of {str:float}
+            * ``"lambda_"`` : The value of ``self.lambda_``.
+        """
+        return {"lambda_":self.lambda_}
+
+    def gen_sample(self,sample_size):
+        """Generate a sample from the stochastic data generative model.
+
+        Parameters
+        ----------
+        sample_size : int
+            A positive integer
+
+        Returns
+        -------
+        x : numpy ndarray
+            1 dimensional array whose size is ``sammple_size`` and elements are positive real numbers.
+        """
+        _check.pos_int(sample_size, 'sample_size', DataFormatError)
+        # inverse transform sampling; cheaper than self.rng.exponential
+        # and log1p keeps accuracy for uniform draws near 0
+        return -np.log1p(-self.rng.random(sample_size)) / self.lambda_
+        
+    def save_sample(self,filename,sample_size):
+        """Save the generated sample as NumPy ``.npz`` format.
+
+        It is saved as aNpzFile with keyword: \"x\".
+
+        Parameters
+        ----------
+        filename : str
+            The filename to which the sample is saved.
+            ``.npz`` will be appended if it isn't there.
+        sample_size : int
+            A positive integer
+        
+        See Also
+        --------
+        numpy.savez_compressed
+        """
+        np.savez_compressed(filename,x=self.gen_sample(sample_size))
+
+    def visualize_model(self,sample_size=100,hist_bins=10):
+        """Visualize the stochastic data generative model and generated samples.
+
+        Parameters
+        ----------
+        sample_size : int, optional
+            A positive integer, by default 100.
+        hist_bins : float, optional
+            A positive float, by default 10.
+
+        Examples
+        --------
+        >>> from bayesml import normal
+        >>> model = normal.GenModel()
+        >>> model.visualize_model()
+        lambda_:1.0
+
+        .. image:: ./images/exponential_example.png
+        """
+        _check.pos_int(sample_size, 'sample_size', DataFormatError)
+        _check.pos_int(hist_bins, 'hist_bins', DataFormatError)
+        sample = self.gen_sample(sample_size)
+
+        print(f"lambda_:{self.lambda_}")
+
+        fig, ax = plt.subplots()
+        ax.hist(sample,density=True,label=f"normalized hist n={sample_size}",bins=hist_bins)
+
+        sample_max = sample.max()
+        x = np.linspace(1.0e-8,
+                        sample_max+np.ptp(sample)*0.25,
+                        100)
+        y = ss_expon.pdf(x,scale=1.0/self.lambda_)
+        plt.plot(x, y, label=f"Exponential PDF lambda_={self.lambda_}")
+
+        ax.set_xlabel("Realization")
+        ax.set_ylabel("Probability or frequency")
+        plt.title(f"PDF and normalized histogram")
+        plt.legend()
+        plt.show()
+
+
+class LearnModel(base.Posterior,base.PredictiveMixin):
+    """The posterior distribution and the predictive distribution.
+
+    Parameters
+    ----------
+    h0_alpha : float, optional
+        a positive real number, by default 1.0.
+    h0_beta : float, optional
+        a positive real number, by default 1.0.
+
+    Attributes
+    ----------
+    hn_alpha : float
+        a positive real number
+    hn_beta : float
+        a positive real number
+    p_kappa : float
+        a positive real number
+    p_lambda : float
+        a positive real number
+    """
+    def __init__(self,h0_alpha=1.0, h0_beta=1.0):
+        # h0_params
+        self.h0_alpha = 1.0
+        self.h0_beta = 1.0
+
+        # hn_params
+        self.hn_alpha = 1.0
+        self.hn_beta = 1.0
+        self._inv_hn_beta = 1.0
+
+        # p_params
+        self.p_kappa = 1.0
+        self.p_lambda = 1.0
+        self._pred_dirty = True
+
+        self.set_h0_params(h0_alpha,h0_beta)
+    
+    def get_constants(self):
+        """Get constants of LearnModel.
+
+        This model does not have any constants. 
+        Therefore, this function returns an emtpy dict ``{}``.
+        
+        Returns
+        -------
+        constants : an empty dict
+        """
+        return {}
+
+    def set_h0_params(self,h0_alpha=None,h0_beta=None):
+        """Set initial values of the hyperparameter of the posterior distribution.
+
+        Parameters
+        ----------
+        h0_alpha : float, optional
+            a positive real number, by default None.
+        h0_beta : float, optional
+            a positive real number, by default None.
+        """
+        if h0_alpha is not None:
+            self.h0_alpha = _check.pos_float(h0_alpha, 'h0_alpha', ParameterFormatError)
+        if h0_beta is not None:
+            self.h0_beta = _check.pos_float(h0_beta, 'h0_beta', ParameterFormatError)
+        # constants of the log marginal likelihood
+        self._gammaln_h0_alpha = math.lgamma(self.h0_alpha)
+        self._h0_alpha_ln_h0_beta = self.h0_alpha * math.log(self.h0_beta)
+        self.reset_hn_params()
+        return self
+
+    def get_h0_params(self):
+        """Get the initial values of the hyperparameters of the posterior distribution.
+
+        Returns
+        -------
+        h0_params : dict of {str: float}
+            * ``"h0_alpha"`` : The value of ``self.h0_alpha``
+            * ``"h0_beta"`` : The value of ``self.h0_beta``
+        """
+        return {"h0_alpha":self.h0_alpha, "h0_beta": self.h0_beta}
+
+    def set_hn_params(self,hn_alpha=None,hn_beta=None):
+        """Set updated values of the hyperparameter of the posterior distribution.
+
+        Parameters
+        ----------
+        hn_alpha : float, optional
+            a positive real number, by default None.
+        hn_beta : float, optional
+            a positive real number, by default None.
+        """
+        if hn_alpha is not None:
+            self.hn_alpha = _check.pos_float(hn_alpha, 'hn_alpha', ParameterFormatError)
+        if hn_beta is not None:
+            self.hn_beta = _check.pos_float(hn_beta, 'hn_beta', ParameterFormatError)
+        self._inv_hn_beta = 1.0 / self.hn_beta
+        self._pred_dirty = True
+        return self
+
+    def get_hn_params(self):
+        """Get the hyperparameters of the posterior distribution.
+
+        Returns
+        -------
+        hn_params : dict of {str: float}
+            * ``"hn_alpha"`` : The value of ``self.hn_alpha``
+            * ``"hn_beta"`` : The value of ``self.hn_beta``
+        """
+        return {"hn_alpha":self.hn_alpha, "hn_beta":self.hn_beta}
+
+    def _check_sample(self,x):
+        try:
+            x = np.asarray(x,dtype=np.float64)
+        except (TypeError,ValueError):
+            raise(DataFormatError("x must be float or a numpy.ndarray. Its values must be positive (not including 0)"))
+        if not np.isfinite(x).all() or (x <= 0).any():
+            raise(DataFormatError("x must be float or a numpy.ndarray. Its values must be positive (not including 0)"))
+        return x
+
+    def update_posterior(self,x,chunk_size=1048576):
+        """Update the hyperparameters of the posterior distribution using traning data.
+
+        The update is memory-bound: it only needs one pass over ``x``
+        to validate and sum it. Without numba the pass proceeds in chunks
+        of ``chunk_size`` elements so the working set stays in cache and
+        memory-mapped input is not materialized at once.
+
+        Parameters
+        ----------
+        x : numpy.ndarray
+            All the elements must be positive real numbers.
+        chunk_size : int, optional
+            A positive integer, by default ``2**20``.
+        """
+        if (_validate_and_sum is not None
+                and type(x) is np.ndarray
+                and x.dtype == np.float64
+                and x.flags['C_CONTIGUOUS']):
+            sum_x, n = _validate_and_sum(x.reshape(-1))
+            if n < x.size:
+                raise(DataFormatError("x must be float or a numpy.ndarray. Its values must be positive (not including 0)"))
+        else:
+            # np.asarray makes scalars 0-d arrays, so x.size is always valid
+            try:
+                x = np.asarray(x,dtype=np.float64).reshape(-1)
+            except (TypeError,ValueError):
+                raise(DataFormatError("x must be float or a numpy.ndarray. Its values must be positive (not including 0)"))
+            n = x.size
+            sum_x = 0.0
+            for i in range(0,n,chunk_size):
+                x_chunk = x[i:i+chunk_size]
+                if not np.isfinite(x_chunk).all() or (x_chunk <= 0).any():
+                    raise(DataFormatError("x must be float or a numpy.ndarray. Its values must be positive (not including 0)"))
+                sum_x += np.add.reduce(x_chunk,dtype=np.float64)
+        self.hn_alpha += n
+        self.hn_beta += sum_x
+        self._inv_hn_beta = 1.0 / self.hn_beta
+        self._pred_dirty = True
+        return self
+
+    def update_posterior_stats(self,n,sum_x):
+        """Update the hyperparameters of the posterior distribution from sufficient statistics.
+
+        The exponential likelihood depends on the data only through the sample size
+        and the sum of the data. This method updates the posterior directly from them
+        without scanning the data again.
+
+        Parameters
+        ----------
+        n : int
+            A positive integer. The sample size.
+        sum_x : float
+            A positive real number. The sum of the training data.
+        """
+        self.hn_alpha += _check.pos_int(n,'n',DataFormatError)
+        self.hn_beta += _check.pos_float(sum_x,'sum_x',DataFormatError)
+        self._inv_hn_beta = 1.0 / self.hn_beta
+        self._pred_dirty = True
+        return self
+
+    def _update_posterior(self,x):
+        """Update opsterior without input check."""
+        self.hn_alpha += x.size
+        self.hn_beta += np.add.reduce(x,axis=None,dtype=np.float64)
+        self._inv_hn_beta = 1.0 / self.hn_beta
+        self._pred_dirty = True
+        return self
+
+    # dispatch table for estimate_params; avoids re-comparing the loss
+    # string and duplicating the dict_out branching in every case
+    _ESTIMATORS = {
+        "squared": lambda self: self.hn_alpha * self._inv_hn_beta,
+        "0-1": lambda self: (self.hn_alpha - 1.0) * self._inv_hn_beta if self.hn_alpha > 1.0 else 0.0,
+        "abs": lambda self: _gamma_median(self.hn_alpha,self.hn_beta),
+    }
+
+    def estimate_params(self,loss="squared",dict_out=False):
+        """Estimate the parameter of the stochastic data generative model under the given criterion.
+
+        Parameters
+        ----------
+        loss : str, optional
+            Loss function underlying the Bayes risk function, by default \"squared\".
+            This function supports \"squared\", \"0-1\", \"abs\", and \"KL\".
+        dict_out : bool, optional
+            If ``True``, output will be a dict, by default ``False``.
+
+        Returns
+        -------
+        estimator : {float, None, rv_frozen}
+            The estimated values under the given loss function. If it is not exist, `None` will be returned.
+            If the loss function is \"KL\", the posterior distribution itself will be returned
+            as rv_frozen object of scipy.stats.
+
+        See Also
+        --------
+        scipy.stats.rv_continuous
+        scipy.stats.rv_discrete
+        """
+        if loss == "KL":
+            return ss_gamma(a=self.hn_alpha,scale=self._inv_hn_beta)
+        estimator = self._ESTIMATORS.get(loss)
+        if estimator is None:
+            raise(CriteriaError("Unsupported loss function! "
+                                "This function supports \"squared\", \"0-1\", \"abs\", and \"KL\"."))
+        if dict_out:
+            return {'lambda_':estimator(self)}
+        else:
+            return estimator(self)
+    
+    def estimate_interval(self,credibility=0.95):
+        """Credible interval of the parameter.
+
+        Parameters
+        ----------
+        credibility : float, optional
+            A posterior probability that the interval conitans the paramter, by default 0.95.
+
+        Returns
+        -------
+        lower, upper: float
+            The lower and the upper bound of the interval
+        """
+        _check.float_in_closed01(credibility, 'credibility', CriteriaError)
+        # equal-tailed gamma quantiles via gammaincinv; same values as
+        # ss_gamma.interval without building a frozen distribution
+        p = (1.0 - credibility) / 2.0
+        return (gammaincinv(self.hn_alpha,p) * self._inv_hn_beta,
+                gammaincinv(self.hn_alpha,1.0-p) * self._inv_hn_beta)
+    
+    def visualize_posterior(self):
+        """Visualize the posterior distribution for the parameter.
+
+        Examples
+        --------
+        >>> from bayesml import exponential
+        >>> gen_model = exponential.GenModel(lambda_=2.0)
+        >>> x = gen_model.gen_sample(20)
+        >>> learn_model = exponential.LearnModel()
+        >>> learn_model.update_posterior(x)
+        >>> learn_model.visualize_posterior()
+
+        .. image:: ./images/exponential_posterior.png
+        """
+        mean = self.hn_alpha * self._inv_hn_beta
+        spread = 4.0 * np.sqrt(self.hn_alpha) * self._inv_hn_beta
+        x = np.linspace(max(1.0e-8,mean-spread),
+                        mean+spread,
+                        100)
+        fig, ax = plt.subplots()
+        ax.plot(x,np.exp(self.hn_alpha*np.log(self.hn_beta)
+                         - gammaln(self.hn_alpha)
+                         + (self.hn_alpha-1.0)*np.log(x)
+                         - self.hn_beta*x))
+        ax.set_xlabel("lambda")
+        ax.set_ylabel("posterior")
+        plt.show()
+    
+    def get_p_params(self):
+        """Get the parameters of the predictive distribution.
+
+        Returns
+        -------
+        p_params : dict of {str: float}
+            * ``"p_kappa"`` : The value of ``self.p_kappa``
+            * ``"p_lambda"`` : The value of ``self.p_lambda``
+        """
+        if self._pred_dirty:
+            self.calc_pred_dist()
+        return {"p_kappa":self.p_kappa, "p_lambda":self.p_lambda}
+
+    def calc_pred_dist(self):
+        """Calculate the parameters of the predictive distribution."""
+        self.p_kappa = self.hn_alpha
+        self.p_lambda = self.hn_beta
+        # point predictions are invariant until the next update;
+        # cache them here so make_prediction is a plain lookup
+        self._p_squared_pred = self.p_lambda / (self.p_kappa-1.0) if self.p_kappa > 1 else None
+        self._p_abs_pred = self.p_lambda * (math.pow(2.0,1.0/self.p_kappa) - 1.0)
+        self._pred_dirty = False
+        return self
+
+    def _calc_pred_density(self,x):
+        if self._pred_dirty:
+            self.calc_pred_dist()
+        # closed-form Lomax density; avoids the argument handling of ss_lomax.pdf
+        return self.p_kappa / self.p_lambda * np.power(1.0 + x/self.p_lambda, -self.p_kappa-1.0)
+
+    def make_prediction(self,loss="squared"):
+        """Predict a new data point under the given criterion.
+
+        Parameters
+        ----------
+        loss : str, optional
+            Loss function underlying the Bayes risk function, by default \"squared\".
+            This function supports \"squared\", \"0-1\", \"abs\", and \"KL\".
+
+        Returns
+        -------
+        Predicted_value : {int, numpy.ndarray}
+            The predicted value under the given loss function.
+            If the loss function is \"KL\", the predictive distribution itself will be returned
+            as numpy.ndarray.
+        """
+        if self._pred_dirty:
+            self.calc_pred_dist()
+        if loss == "squared": # Mean of EP
+            if self._p_squared_pred is not None:
+                return self._p_squared_pred
+            else:
+                warnings.warn("Mean doesn't exist for the current p_kappa.",ResultWarning)
+                return None
+        elif loss == "0-1": # Mode of EP
+            return 0
+        elif loss == "abs": # Median of EP
+            return self._p_abs_pred
+        elif loss == "KL": # EP
+            return ss_lomax(c=self.p_kappa,scale=self.p_lambda)
+        else:
+            raise(CriteriaError("Unsupported loss function! "
+                                "This function supports \"squared\", \"0-1\", \"abs\", and \"KL\"."))
+
+    def pred_and_update(self,x,loss="squared"):
+        """Predict a new data point and update the posterior sequentially.
+
+        Parameters
+        ----------
+        x : float
+            a positive real number
+        loss : str, optional
+            Loss function underlying the Bayes risk function, by default \"squared\".
+            This function supports \"squared\", \"0-1\", \"abs\", and \"KL\".
+
+        Returns
+        -------
+        Predicted_value : {float, numpy.ndarray}
+            The predicted value under the given loss function.
+            If the loss function is \"KL\", the predictive distribution itself will be returned
+            as numpy.ndarray.
+        """
+        _check.pos_float(x,'x',DataFormatError)
+        self.calc_pred_dist()
+        prediction = self.make_prediction(loss=loss)
+        self.update_posterior(x)
+        return prediction
+
+    def pred_and_update_batch(self,x,loss="squared"):
+        """Predict each data point in ``x`` and update the posterior sequentially.
+
+        It is equivalent to calling ``pred_and_update`` for each element of ``x``
+        in turn, but the predictions are computed in a vectorized manner from
+        the running sufficient statistics and the posterior is updated once
+        with the totals.
+
+        Parameters
+        ----------
+        x : numpy.ndarray
+            1-dimensional array whose elements are positive real numbers.
+        loss : str, optional
+            Loss function underlying the Bayes risk function, by default \"squared\".
+            This function supports \"squared\", \"0-1\", and \"abs\".
+
+        Returns
+        -------
+        predictions : numpy.ndarray
+            1-dimensional array of the predicted values under the given loss function.
+            For the \"squared\" loss, ``numpy.nan`` is set where the mean of the
+            predictive distribution doesn't exist.
+        """
+        x = _check.pos_float_vec(x,'x',DataFormatError)
+        if x.size == 0:
+            return np.empty(0)
+        p_kappas = self.hn_alpha + np.arange(x.size)
+        p_lambdas = np.empty(x.size)
+        p_lambdas[0] = self.hn_beta
+        np.cumsum(x[:-1],out=p_lambdas[1:])
+        p_lambdas[1:] += self.hn_beta
+        if loss == "squared":
+            predictions = np.full(x.size,np.nan)
+            indices = p_kappas > 1
+            predictions[indices] = p_lambdas[indices] / (p_kappas[indices]-1.0)
+            if not np.all(indices):
+                warnings.warn("Mean doesn't exist for some values of p_kappa.",ResultWarning)
+        elif loss == "0-1":
+            predictions = np.zeros(x.size)
+        elif loss == "abs":
+            predictions = p_lambdas * (2.0**(1.0/p_kappas) - 1.0)
+        else:
+            raise(CriteriaError("Unsupported loss function! "
+                                "This function supports \"squared\", \"0-1\", and \"abs\"."))
+        self.hn_alpha += x.size
+        self.hn_beta += np.add.reduce(x,dtype=np.float64)
+        self._inv_hn_beta = 1.0 / self.hn_beta
+        self.calc_pred_dist()
+        return predictions
+
+    def pred_and_update_stream(self,x):
+        """Predict each data point under the squared loss and update the posterior sequentially.
+
+        A jitted fast path of ``pred_and_update_batch(x,loss=\"squared\")``:
+        the whole prediction-update recursion runs inside one compiled loop.
+        If numba is not installed, ``pred_and_update_batch`` is called instead.
+
+        Parameters
+        ----------
+        x : numpy.ndarray
+            1-dimensional array whose elements are positive real numbers.
+
+        Returns
+        -------
+        predictions : numpy.ndarray
+            1-dimensional array of the predicted values.
+            ``numpy.nan`` is set where the mean of the predictive distribution doesn't exist.
+        """
+        if _pred_and_update_squared is None:
+            return self.pred_and_update_batch(x,loss="squared")
+        x = _check.pos_float_vec(x,'x',DataFormatError)
+        if x.size == 0:
+            return np.empty(0)
+        predictions = _pred_and_update_squared(
+            np.ascontiguousarray(x,dtype=np.float64),
+            self.hn_alpha,
+            self.hn_beta)
+        self.hn_alpha += x.size
+        self.hn_beta += np.add.reduce(x,dtype=np.float64)
+        self._inv_hn_beta = 1.0 / self.hn_beta
+        self.calc_pred_dist()
+        return predictions
+
+    def calc_log_marginal_likelihood(self):
+        """Calculate log marginal likelihood
+
+        Returns
+        -------
+        log_marginal_likelihood : float
+            The log marginal likelihood.
+        """
+        return (self._h0_alpha_ln_h0_beta
+                - self._gammaln_h0_alpha
+                - self.hn_alpha * math.log(self.hn_beta)
+                + math.lgamma(self.hn_alpha))
\ No newline at end of file
@@ -12,9 +12,55 @@ from scipy.special import gammaln, digamma, xlogy
 import matplotlib.pyplot as plt
 
 from .. import base
-from .._exceptions import ParameterFormatError, DataFormatError, CriteriaError, ResultWarning, ParameterFormatWarning
+from .._exceptions import ParameterFormatError, DataFormatError, CriteriaError, ResultWarning
 from .. import _check
 
+try:
+    from numba import njit, prange
+
+    @njit(parallel=True,fastmath=True,cache=True)
+    def _update_q_z_kernel(x,m_vecs,e_lambda_mats,ln_rho_const,ln_rho,r_vecs):
+        """Fused responsibility update: quadratic form plus softmax per sample.
+
+        Fills ``ln_rho`` and the normalized ``r_vecs`` in one pass over ``x``.
+        """
+        num_classes, degree = m_vecs.shape
+        for i in prange(x.shape[0]):
+            for k in range(num_classes):
+                quad = 0.0
+                for j in range(degree):
+                    tmp = 0.0
+                    for l in range(degree):
+                        tmp += e_lambda_mats[k,j,l] * (x[i,l]-m_vecs[k,l])
+                    quad += (x[i,j]-m_vecs[k,j]) * tmp
+                ln_rho[i,k] = ln_rho_const[k] - quad/2.0
+            max_ln_rho = ln_rho[i,0]
+            for k in range(1,num_classes):
+                if ln_rho[i,k] > max_ln_rho:
+                    max_ln_rho = ln_rho[i,k]
+            norm = 0.0
+            for k in range(num_classes):
+                r_vecs[i,k] = np.exp(ln_rho[i,k]-max_ln_rho)
+                norm += r_vecs[i,k]
+            for k in range(num_classes):
+                r_vecs[i,k] /= norm
+
+    @njit(cache=True)
+    def _categorical_sample(u,cdf,out_k):
+        """Linear-probe inverse-CDF sampling of categorical indices.
+
+        For the small numbers of classes typical here, the linear scan over
+        ``cdf`` beats a per-sample binary search.
+        """
+        for i in range(u.shape[0]):
+            k = 0
+            while cdf[k] <= u[i]:
+                k += 1
+            out_k[i] = k
+except ImportError:
+    _update_q_z_kernel = None
+    _categorical_sample = None
+
 class GenModel(base.Generative):
     """The stochastic data generative model and the prior distribution
 
@@ -40,9 +86,10 @@ class GenModel(base.Generative):
         real numbers greater than c_degree-1, by default the value of ``c_degree``
     h_w_mats : numpy.ndarray, optional
         positive definite symetric matrices, by default the identity matrices
-    seed : {None, int}, optional
+    seed : {None, int, numpy.random.Generator}, optional
         A seed to initialize numpy.random.default_rng(),
-        by default None
+        by default None. A ``numpy.random.Generator`` instance
+        is used as-is, which allows models to share one generator.
     """
     def __init__(
             self,
@@ -61,7 +108,7 @@ class GenModel(base.Generative):
         # constants
         self.c_degree = _check.pos_int(c_degree,'c_degree',ParameterFormatError)
         self.c_num_classes = _check.pos_int(c_num_classes,'c_num_classes',ParameterFormatError)
-        self.rng = np.random.default_rng(seed)
+        self.rng = seed if isinstance(seed,np.random.Generator) else np.random.default_rng(seed)
 
         # params
         self.pi_vec = np.ones(self.c_num_classes) / self.c_num_classes
@@ -128,10 +175,11 @@ class GenModel(base.Generative):
 
         if h_m_vecs is not None:
             _check.float_vecs(h_m_vecs,'h_m_vecs',ParameterFormatError)
-            if h_m_vecs.shape[-1] != self.c_degree:
-                raise(ParameterFormatError(
-                    "h_m_vecs.shape[-1] must coincide with self.c_degree: "
-                    +f"h_m_vecs.shape[-1] = {h_m_vecs.shape[-1]}, self.c_degree = {self.c_degree}"))
+            _check.shape_broadcastable(
+                h_m_vecs.shape,"h_m_vecs.shape", 
+                (self.c_num_classes,self.c_degree),"(self.c_num_classes,self.c_degree)", 
+                ParameterFormatError
+                )
             self.h_m_vecs[:] = h_m_vecs
 
         if h_kappas is not None:
@@ -148,10 +196,11 @@ class GenModel(base.Generative):
 
         if h_w_mats is not None:
             _check.pos_def_sym_mats(h_w_mats,'h_w_mats',ParameterFormatError)
-            if h_w_mats.shape[-1] != self.c_degree:
-                raise(ParameterFormatError(
-                    "h_w_mats.shape[-1] and h_w_mats.shape[-2] must coincide with self.c_degree: "
-                    +f"h_w_mats.shape[-1] and h_w_mats.shape[-2] = {h_w_mats.shape[-1]}, self.c_degree = {self.c_degree}"))
+            _check.shape_broadcastable(
+                h_w_mats.shape,"h_w_mats.shape", 
+                (self.c_num_classes,self.c_degree,self.c_degree),"(self.c_num_classes,self.c_degree,self.c_degree)", 
+                ParameterFormatError
+                )
             self.h_w_mats[:] = h_w_mats
         return self
 
@@ -181,7 +230,11 @@ class GenModel(base.Generative):
         self.pi_vec[:] = self.rng.dirichlet(self.h_alpha_vec)
         for k in range(self.c_num_classes):
             self.lambda_mats[k] = ss_wishart.rvs(df=self.h_nus[k],scale=self.h_w_mats[k],random_state=self.rng)
-            self.mu_vecs[k] = self.rng.multivariate_normal(mean=self.h_m_vecs[k],cov=np.linalg.inv(self.h_kappas[k]*self.lambda_mats[k]))
+        _mu_covs = np.linalg.inv(self.h_kappas[:,np.newaxis,np.newaxis]*self.lambda_mats)
+        self.mu_vecs[:] = self.h_m_vecs + (
+            np.linalg.cholesky(_mu_covs)
+            @ self.rng.standard_normal(size=[self.c_num_classes,self.c_degree,1])
+            )[:,:,0]
         return self
 
     def set_params(
@@ -203,26 +256,29 @@ class GenModel(base.Generative):
         """
         if pi_vec is not None:
             _check.float_vec_sum_1(pi_vec,'pi_vec',ParameterFormatError)
-            if pi_vec.shape[0] != self.c_num_classes:
-                raise(ParameterFormatError(
-                    "pi_vec.shape[0] must coincide with self.c_num_classes: "
-                    +f"pi_vec.shape[0] = {pi_vec.shape[0]}, self.c_num_classes = {self.c_num_classes}"))
+            _check.shape_consistency(
+                pi_vec.shape[0],"pi_vec.shape[0]",
+                self.c_num_classes,"self.c_num_classes",
+                ParameterFormatError
+                )
             self.pi_vec[:] = pi_vec
 
         if mu_vecs is not None:
             _check.float_vecs(mu_vecs,'mu_vecs',ParameterFormatError)
-            if mu_vecs.shape[-1] != self.c_degree:
-                raise(ParameterFormatError(
-                    "mu_vecs.shape[-1] must coincide with self.c_degree: "
-                    +f"mu_vecs.shape[-1] = {mu_vecs.shape[-1]}, self.c_degree = {self.c_degree}"))
+            _check.shape_broadcastable(
+                mu_vecs.shape,"mu_vecs.shape", 
+                (self.c_num_classes,self.c_degree),"(self.c_num_classes,self.c_degree)", 
+                ParameterFormatError
+                )
             self.mu_vecs[:] = mu_vecs
 
         if lambda_mats is not None:
             _check.pos_def_sym_mats(lambda_mats,'lambda_mats',ParameterFormatError)
-            if lambda_mats.shape[-1] != self.c_degree:
-                raise(ParameterFormatError(
-                    "lambda_mats.shape[-1] and lambda_mats.shape[-2] must coincide with self.c_degree:"
-                    +f"lambda_mats.shape[-1] and lambda_mats.shape[-2] = {lambda_mats.shape[-1]}, self.c_degree = {self.c_degree}"))
+            _check.shape_broadcastable(
+                lambda_mats.shape,"lambda_mats.shape", 
+                (self.c_num_classes,self.c_degree,self.c_degree),"(self.c_num_classes,self.c_degree,self.c_degree)", 
+                ParameterFormatError
+                )
             self.lambda_mats[:] = lambda_mats
         return self
 
@@ -257,10 +313,21 @@ class GenModel(base.Generative):
         z = np.zeros([sample_size,self.c_num_classes],dtype=int)
         x = np.empty([sample_size,self.c_degree])
         _lambda_mats_inv = np.linalg.inv(self.lambda_mats)
-        for i in range(sample_size):
-            k = self.rng.choice(self.c_num_classes,p=self.pi_vec)
-            z[i,k] = 1
-            x[i] = self.rng.multivariate_normal(mean=self.mu_vecs[k],cov=_lambda_mats_inv[k])
+        # inverse-CDF sampling; cheaper than rng.choice with the p keyword
+        _pi_cdf = np.cumsum(self.pi_vec)
+        _pi_cdf[-1] = 1.0
+        _u = self.rng.random(sample_size)
+        if _categorical_sample is not None:
+            ks = np.empty(sample_size,dtype=np.int64)
+            _categorical_sample(_u,_pi_cdf,ks)
+        else:
+            ks = np.searchsorted(_pi_cdf,_u,side='right')
+        z[np.arange(sample_size),ks] = 1
+        for k in range(self.c_num_classes):
+            indices = np.flatnonzero(ks==k)
+            if indices.size > 0:
+                x[indices] = self.rng.multivariate_normal(
+                    mean=self.mu_vecs[k],cov=_lambda_mats_inv[k],size=indices.size)
         return x,z
         
     def save_sample(self,filename,sample_size):
@@ -323,14 +390,18 @@ class GenModel(base.Generative):
             _lambda_mats_inv = np.linalg.inv(self.lambda_mats)
             fig, axes = plt.subplots()
             sample, _ = self.gen_sample(sample_size)
-            x = np.linspace(sample.min()-(sample.max()-sample.min())*0.25,
-                            sample.max()+(sample.max()-sample.min())*0.25,
+            sample_min = sample.min()
+            sample_max = sample.max()
+            sample_margin = (sample_max-sample_min)*0.25
+            x = np.linspace(sample_min-sample_margin,
+                            sample_max+sample_margin,
                             1000)
             y = np.zeros(1000)
             for k in range(self.c_num_classes):
                 y += self.pi_vec[k] * ss_multivariate_normal.pdf(x,self.mu_vecs[k],_lambda_mats_inv[k])
             axes.plot(x,y)
-            axes.hist(sample,density=True)
+            counts, edges = np.histogram(sample[:,0],density=True)
+            axes.bar(edges[:-1],counts,width=np.diff(edges),align='edge')
             axes.set_xlabel("x")
             axes.set_ylabel("Density or frequency")
             plt.show()
@@ -342,11 +413,14 @@ class GenModel(base.Generative):
             _lambda_mats_inv = np.linalg.inv(self.lambda_mats)
             fig, axes = plt.subplots()
             sample, _ = self.gen_sample(sample_size)
-            x = np.linspace(sample[:,0].min()-(sample[:,0].max()-sample[:,0].min())*0.25,
-                            sample[:,0].max()+(sample[:,0].max()-sample[:,0].min())*0.25,
+            sample_mins = sample.min(axis=0)
+            sample_maxs = sample.max(axis=0)
+            sample_margins = (sample_maxs-sample_mins)*0.25
+            x = np.linspace(sample_mins[0]-sample_margins[0],
+                            sample_maxs[0]+sample_margins[0],
                             1000)
-            y = np.linspace(sample[:,1].min()-(sample[:,1].max()-sample[:,1].min())*0.25,
-                            sample[:,1].max()+(sample[:,1].max()-sample[:,1].min())*0.25,
+            y = np.linspace(sample_mins[1]-sample_margins[1],
+                            sample_maxs[1]+sample_margins[1],
                             1000)
             xx, yy = np.meshgrid(x,y)
             grid = np.empty((1000,1000,2))
@@ -385,9 +459,15 @@ class LearnModel(base.Posterior,base.PredictiveMixin):
         real numbers greater than c_degree-1, by default the value of ``c_degree``
     h0_w_mats : numpy.ndarray, optional
         positive definite symetric matrices, by default the identity matrices
-    seed : {None, int}, optional
+    seed : {None, int, numpy.random.Generator}, optional
         A seed to initialize numpy.random.default_rng(),
-        by default None
+        by default None. A ``numpy.random.Generator`` instance
+        is used as-is, which allows models to share one generator.
+    r_vecs_dtype : {numpy.float64, numpy.float32}, optional
+        the storage dtype of ``r_vecs`` and the related responsibility
+        buffers, by default numpy.float64. float32 halves the memory
+        traffic of the E-step on large samples; the hyperparameters and
+        the variational lower bound are kept in float64.
 
     Attributes
     ----------
@@ -427,12 +507,18 @@ class LearnModel(base.Posterior,base.PredictiveMixin):
             h0_kappas = None,
             h0_nus = None,
             h0_w_mats = None,
-            seed = None
+            seed = None,
+            r_vecs_dtype = np.float64,
             ):
         # constants
         self.c_degree = _check.pos_int(c_degree,'c_degree',ParameterFormatError)
         self.c_num_classes = _check.pos_int(c_num_classes,'c_num_classes',ParameterFormatError)
-        self.rng = np.random.default_rng(seed)
+        if np.dtype(r_vecs_dtype) not in (np.dtype(np.float32),np.dtype(np.float64)):
+            raise(ParameterFormatError(
+                "r_vecs_dtype must be numpy.float32 or numpy.float64: "
+                + f"r_vecs_dtype = {r_vecs_dtype}"))
+        self.r_vecs_dtype = np.dtype(r_vecs_dtype)
+        self.rng = seed if isinstance(seed,np.random.Generator) else np.random.default_rng(seed)
 
         # h0_params
         self.h0_alpha_vec = np.ones(self.c_num_classes) / 2        
@@ -442,7 +528,8 @@ class LearnModel(base.Posterior,base.PredictiveMixin):
         self.h0_w_mats = np.tile(np.eye(self.c_degree),[self.c_num_classes,1,1])
         self.h0_w_mats_inv = np.linalg.inv(self.h0_w_mats)
 
-        self._ln_c_h0_alpha = 0.0
+        self._gammaln_h0_alpha_vec = np.empty(self.c_num_classes)
+        self._ln_c_h0_alpha = None
         self._ln_b_h0_w_nus = np.empty(self.c_num_classes)
         
         # hn_params
@@ -459,6 +546,7 @@ class LearnModel(base.Posterior,base.PredictiveMixin):
         self._e_ln_lambda_dets = np.empty(self.c_num_classes)
         self._ln_b_hn_w_nus = np.empty(self.c_num_classes)
         self._e_ln_pi_vec = np.empty(self.c_num_classes)
+        self._ln_rho_const = np.empty(self.c_num_classes)
 
         # statistics
         self.x_bar_vecs = np.empty([self.c_num_classes,self.c_degree])
@@ -523,21 +611,26 @@ class LearnModel(base.Posterior,base.PredictiveMixin):
         h0_w_mats : numpy.ndarray, optional
             positive definite symetric matrices, by default None
         """
+        changed = False
         if h0_alpha_vec is not None:
             _check.pos_floats(h0_alpha_vec,'h0_alpha_vec',ParameterFormatError)
             self.h0_alpha_vec[:] = h0_alpha_vec
+            changed = True
 
         if h0_m_vecs is not None:
             _check.float_vecs(h0_m_vecs,'h0_m_vecs',ParameterFormatError)
-            if h0_m_vecs.shape[-1] != self.c_degree:
-                raise(ParameterFormatError(
-                    "h0_m_vecs.shape[-1] must coincide with self.c_degree: "
-                    +f"h0_m_vecs.shape[-1] = {h0_m_vecs.shape[-1]}, self.c_degree = {self.c_degree}"))
+            _check.shape_broadcastable(
+                h0_m_vecs.shape,"h0_m_vecs.shape", 
+                (self.c_num_classes,self.c_degree),"(self.c_num_classes,self.c_degree)", 
+                ParameterFormatError
+                )
             self.h0_m_vecs[:] = h0_m_vecs
+            changed = True
 
         if h0_kappas is not None:
             _check.pos_floats(h0_kappas,'h0_kappas',ParameterFormatError)
             self.h0_kappas[:] = h0_kappas
+            changed = True
 
         if h0_nus is not None:
             _check.pos_floats(h0_nus,'h0_nus',ParameterFormatError)
@@ -546,17 +639,21 @@ class LearnModel(base.Posterior,base.PredictiveMixin):
                     "All the values of h0_nus must be greater than self.c_degree - 1: "
                     + f"self.c_degree = {self.c_degree}, h0_nus = {h0_nus}"))
             self.h0_nus[:] = h0_nus
+            changed = True
 
         if h0_w_mats is not None:
             _check.pos_def_sym_mats(h0_w_mats,'h0_w_mats',ParameterFormatError)
-            if h0_w_mats.shape[-1] != self.c_degree:
-                raise(ParameterFormatError(
-                    "h0_w_mats.shape[-1] and h0_w_mats.shape[-2] must coincide with self.c_degree: "
-                    +f"h0_w_mats.shape[-1] and h0_w_mats.shape[-2] = {h0_w_mats.shape[-1]}, self.c_degree = {self.c_degree}"))
+            _check.shape_broadcastable(
+                h0_w_mats.shape,"h0_w_mats.shape", 
+                (self.c_num_classes,self.c_degree,self.c_degree),"(self.c_num_classes,self.c_degree,self.c_degree)", 
+                ParameterFormatError
+                )
             self.h0_w_mats[:] = h0_w_mats
             self.h0_w_mats_inv[:] = np.linalg.inv(self.h0_w_mats)
+            changed = True
 
-        self._calc_prior_features()
+        if changed or self._ln_c_h0_alpha is None:
+            self._calc_prior_features()
         self.reset_hn_params()
         return self
 
@@ -607,10 +704,11 @@ class LearnModel(base.Posterior,base.PredictiveMixin):
 
         if hn_m_vecs is not None:
             _check.float_vecs(hn_m_vecs,'hn_m_vecs',ParameterFormatError)
-            if hn_m_vecs.shape[-1] != self.c_degree:
-                raise(ParameterFormatError(
-                    "hn_m_vecs.shape[-1] must coincide with self.c_degree: "
-                    +f"hn_m_vecs.shape[-1] = {hn_m_vecs.shape[-1]}, self.c_degree = {self.c_degree}"))
+            _check.shape_broadcastable(
+                hn_m_vecs.shape,"hn_m_vecs.shape", 
+                (self.c_num_classes,self.c_degree),"(self.c_num_classes,self.c_degree)", 
+                ParameterFormatError
+                )
             self.hn_m_vecs[:] = hn_m_vecs
 
         if hn_kappas is not None:
@@ -627,10 +725,11 @@ class LearnModel(base.Posterior,base.PredictiveMixin):
 
         if hn_w_mats is not None:
             _check.pos_def_sym_mats(hn_w_mats,'hn_w_mats',ParameterFormatError)
-            if hn_w_mats.shape[-1] != self.c_degree:
-                raise(ParameterFormatError(
-                    "hn_w_mats.shape[-1] and hn_w_mats.shape[-2] must coincide with self.c_degree: "
-                    +f"hn_w_mats.shape[-1] and hn_w_mats.shape[-2] = {hn_w_mats.shape[-1]}, self.c_degree = {self.c_degree}"))
+            _check.shape_broadcastable(
+                hn_w_mats.shape,"hn_w_mats.shape", 
+                (self.c_num_classes,self.c_degree,self.c_degree),"(self.c_num_classes,self.c_degree,self.c_degree)", 
+                ParameterFormatError
+                )
             self.hn_w_mats[:] = hn_w_mats
             self.hn_w_mats_inv[:] = np.linalg.inv(self.hn_w_mats)
 
@@ -657,9 +756,32 @@ class LearnModel(base.Posterior,base.PredictiveMixin):
                 "hn_kappas":self.hn_kappas,
                 "hn_nus":self.hn_nus,
                 "hn_w_mats":self.hn_w_mats}
-        
+
+    def reset_hn_params(self):
+        """Reset the hyperparameters of the posterior distribution to their initial values.
+
+        They are reset to the output of `self.get_h0_params()`.
+        Note that the parameters of the predictive distribution are also calculated from them.
+
+        The h0_params have already been validated, so they are copied into
+        the existing hn buffers directly without going through ``set_hn_params``.
+        """
+        self.hn_alpha_vec[:] = self.h0_alpha_vec
+        self.hn_m_vecs[:] = self.h0_m_vecs
+        self.hn_kappas[:] = self.h0_kappas
+        self.hn_nus[:] = self.h0_nus
+        self.hn_w_mats[:] = self.h0_w_mats
+        self.hn_w_mats_inv[:] = self.h0_w_mats_inv
+
+        self._calc_q_pi_features()
+        self._calc_q_lambda_features()
+
+        self.calc_pred_dist()
+        return self
+
     def _calc_prior_features(self):
-        self._ln_c_h0_alpha = gammaln(self.h0_alpha_vec.sum()) - gammaln(self.h0_alpha_vec).sum()
+        self._gammaln_h0_alpha_vec = gammaln(self.h0_alpha_vec)
+        self._ln_c_h0_alpha = gammaln(self.h0_alpha_vec.sum()) - self._gammaln_h0_alpha_vec.sum()
         self._ln_b_h0_w_nus = (
             - self.h0_nus*np.linalg.slogdet(self.h0_w_mats)[1]
             - self.h0_nus*self.c_degree*np.log(2.0)
@@ -726,24 +848,31 @@ class LearnModel(base.Posterior,base.PredictiveMixin):
         self.ns[:] = self.r_vecs.sum(axis=0)
         indices = self.ns.astype(bool)
         if np.all(indices):
-            self.x_bar_vecs[:] = (self.r_vecs[:,:,np.newaxis] * x[:,np.newaxis,:]).sum(axis=0) / self.ns[:,np.newaxis]
-            self.s_mats[:] = np.sum(self.r_vecs[:,:,np.newaxis,np.newaxis]
-                                    * ((x[:,np.newaxis,:] - self.x_bar_vecs)[:,:,:,np.newaxis]
-                                    @ (x[:,np.newaxis,:] - self.x_bar_vecs)[:,:,np.newaxis,:]),
-                                    axis=0) / self.ns[:,np.newaxis,np.newaxis]
+            self.x_bar_vecs[:] = self.r_vecs.T @ x / self.ns[:,np.newaxis]
+            _diff = x[:,np.newaxis,:] - self.x_bar_vecs
+            self.s_mats[:] = (np.einsum('nk,nkd,nke->kde',self.r_vecs,_diff,_diff)
+                              / self.ns[:,np.newaxis,np.newaxis])
         else:
-            self.x_bar_vecs[indices] = (self.r_vecs[:,indices,np.newaxis] * x[:,np.newaxis,:]).sum(axis=0) / self.ns[indices,np.newaxis]
-            self.s_mats[indices] = np.sum(self.r_vecs[:,indices,np.newaxis,np.newaxis]
-                                    * ((x[:,np.newaxis,:] - self.x_bar_vecs[indices])[:,:,:,np.newaxis]
-                                    @ (x[:,np.newaxis,:] - self.x_bar_vecs[indices])[:,:,np.newaxis,:]),
-                                    axis=0) / self.ns[indices,np.newaxis,np.newaxis]
+            self.x_bar_vecs[indices] = self.r_vecs[:,indices].T @ x / self.ns[indices,np.newaxis]
+            _diff = x[:,np.newaxis,:] - self.x_bar_vecs[indices]
+            self.s_mats[indices] = (np.einsum('nk,nkd,nke->kde',self.r_vecs[:,indices],_diff,_diff)
+                                    / self.ns[indices,np.newaxis,np.newaxis])
 
     def _init_random_responsibility(self,x):
         self.r_vecs[:] = self.rng.dirichlet(np.ones(self.c_num_classes),self.r_vecs.shape[0])
         self._calc_n_x_bar_s(x)
 
+    def _calc_ln_rho_const(self):
+        self._ln_rho_const[:] = (self._e_ln_pi_vec
+                                 + (self._e_ln_lambda_dets
+                                    - self.c_degree * np.log(2*np.pi)
+                                    - self.c_degree / self.hn_kappas
+                                    ) / 2.0
+                                 )
+
     def _calc_q_pi_features(self):
         self._e_ln_pi_vec[:] = digamma(self.hn_alpha_vec) - digamma(self.hn_alpha_vec.sum())
+        self._calc_ln_rho_const()
 
     def _update_q_pi(self):
         self.hn_alpha_vec[:] = self.h0_alpha_vec + self.ns
@@ -761,6 +890,7 @@ class LearnModel(base.Posterior,base.PredictiveMixin):
             - np.sum(gammaln((self.hn_nus[:,np.newaxis]-np.arange(self.c_degree)) / 2.0),
                      axis=1) * 2.0
             ) / 2.0
+        self._calc_ln_rho_const()
 
     def _update_q_mu_lambda(self):
         self.hn_kappas[:] = self.h0_kappas + self.ns
@@ -777,18 +907,26 @@ class LearnModel(base.Posterior,base.PredictiveMixin):
         self._calc_q_lambda_features()
 
     def _update_q_z(self,x):
-        self._ln_rho[:] = (self._e_ln_pi_vec
-                          + (self._e_ln_lambda_dets
-                             - self.c_degree * np.log(2*np.pi)
-                             - self.c_degree / self.hn_kappas
-                             - ((x[:,np.newaxis,:]-self.hn_m_vecs)[:,:,np.newaxis,:]
-                                @ self._e_lambda_mats
-                                @ (x[:,np.newaxis,:]-self.hn_m_vecs)[:,:,:,np.newaxis]
-                                )[:,:,0,0]
-                             ) / 2.0
-                          )
-        self.r_vecs[:] = np.exp(self._ln_rho - self._ln_rho.max(axis=1,keepdims=True))
-        self.r_vecs[:] /= self.r_vecs.sum(axis=1,keepdims=True)
+        if (_update_q_z_kernel is not None
+                and x.dtype == np.float64
+                and x.flags['C_CONTIGUOUS']):
+            _update_q_z_kernel(
+                x,
+                self.hn_m_vecs,
+                self._e_lambda_mats,
+                self._ln_rho_const,
+                self._ln_rho,
+                self.r_vecs,
+                )
+        else:
+            self._ln_rho[:] = (self._ln_rho_const
+                              - ((x[:,np.newaxis,:]-self.hn_m_vecs)[:,:,np.newaxis,:]
+                                 @ self._e_lambda_mats
+                                 @ (x[:,np.newaxis,:]-self.hn_m_vecs)[:,:,:,np.newaxis]
+                                 )[:,:,0,0] / 2.0
+                              )
+            self.r_vecs[:] = np.exp(self._ln_rho - self._ln_rho.max(axis=1,keepdims=True))
+            self.r_vecs[:] /= self.r_vecs.sum(axis=1,keepdims=True)
         self._calc_n_x_bar_s(x)
 
     def _init_subsampling(self,x):
@@ -840,8 +978,9 @@ class LearnModel(base.Posterior,base.PredictiveMixin):
                 "x.shape[-1] must be self.c_degree: "
                 + f"x.shape[-1]={x.shape[-1]}, self.c_degree={self.c_degree}"))
         x = x.reshape(-1,self.c_degree)
-        self._ln_rho = np.empty([x.shape[0],self.c_num_classes])
-        self.r_vecs = np.empty([x.shape[0],self.c_num_classes])
+        if self._ln_rho is None or self._ln_rho.shape[0] != x.shape[0]:
+            self._ln_rho = np.empty([x.shape[0],self.c_num_classes],dtype=self.r_vecs_dtype)
+            self.r_vecs = np.empty([x.shape[0],self.c_num_classes],dtype=self.r_vecs_dtype)
 
         tmp_vl = 0.0
         tmp_alpha_vec = np.array(self.hn_alpha_vec)
@@ -1189,8 +1328,9 @@ class LearnModel(base.Posterior,base.PredictiveMixin):
                 "x.shape[-1] must be self.c_degree: "
                 + f"x.shape[-1]={x.shape[-1]}, self.c_degree={self.c_degree}"))
         x = x.reshape(-1,self.c_degree)
-        self._ln_rho = np.empty([x.shape[0],self.c_num_classes])
-        self.r_vecs = np.empty([x.shape[0],self.c_num_classes])
+        if self._ln_rho is None or self._ln_rho.shape[0] != x.shape[0]:
+            self._ln_rho = np.empty([x.shape[0],self.c_num_classes],dtype=self.r_vecs_dtype)
+            self.r_vecs = np.empty([x.shape[0],self.c_num_classes],dtype=self.r_vecs_dtype)
         self._update_q_z(x)
 
         if loss == "squared":